@@ -3,19 +3,43 @@
 Purple circle background with gold counterclockwise arrows and a gold "R" in the center.
 
 Usage:
-    python3 generate_icon.py
+    python3 generate_icon.py          # writes icon_1024.png
+    python3 generate_icon.py --raw    # writes raw RGBA bytes to stdout
+    python3 generate_icon.py --sizes 512 256 32  # also writes icon_<n>.png previews
 
 Then run `npx tauri icon icon_1024.png -o .` from this directory to generate
 all platform-specific icon variants (icns, ico, sized PNGs).
+
+With --raw icon_1024.png is not written: a "<width> <height> RGBA" header goes
+to stderr and the unencoded pixels to stdout, for build tooling that would
+otherwise just decode the PNG again. Any --sizes variants and the "R" sprite
+cache are still written to disk.
+
+A plain run is skipped when icon_1024.png is unchanged since this script last
+wrote it and the script and installed Pillow version are the same; both
+digests are recorded in icon_1024.png.sha256. Pass --force to redraw anyway
+(also re-rasterizing the cached "R"), e.g. after installing a font, which does
+not change this script.
 """
 
+import argparse
+import functools
+import hashlib
 import math
+import os
+import sys
 
+import PIL
 from PIL import Image, ImageDraw, ImageFont
 
 SIZE = 1024
 CENTER = SIZE // 2
 
+# Everything is drawn on a canvas SUPERSAMPLE times larger and downsampled
+# with LANCZOS on save; Pillow's ellipse/polygon fills are not anti-aliased.
+SUPERSAMPLE = 2
+RENDER_SIZE = SIZE * SUPERSAMPLE
+
 # Colors
 PURPLE = (124, 58, 237, 255)  # #7C3AED
 PURPLE_DARK = (109, 40, 217, 255)  # #6D28D9
@@ -35,7 +59,16 @@ ARC1_END = 315
 ARC2_START = 345  # Arc 2: CW from 345° to 135°
 ARC2_END = 135
 
-POLYGON_SEGMENTS = 200  # smoothness of arc edges
+# Central letter: (path, face index) candidates, tried in order
+FONT_SIZE = 380
+_FONT_CANDIDATES = (
+    ("/System/Library/Fonts/Supplemental/Verdana Bold.ttf", 0),
+    ("/System/Library/Fonts/HelveticaNeue.ttc", 8),  # Helvetica Neue Bold
+    ("/Library/Fonts/Arial.ttf", 0),
+)
+
+# Rasterized "R" masks are cached next to this script, keyed by font and size
+SPRITE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
 def point_on_circle(cx, cy, r, angle_deg):
@@ -44,105 +77,229 @@ def point_on_circle(cx, cy, r, angle_deg):
     return (cx + r * math.cos(rad), cy + r * math.sin(rad))
 
 
+def draw_arrowhead(draw, cx, cy, r, angle_deg, head_length, head_half_width, color):
+    """Draw a triangular arrowhead at angle_deg pointing CCW along the circle.
+
+    The base is radial, centered on the arc centerline, so it lines up with the
+    square end Pillow gives an arc drawn with a width.
+    """
+    # Tip: on the centerline, past the base in the CCW direction
+    head_delta_deg = math.degrees(head_length / r)
+    tip = point_on_circle(cx, cy, r, angle_deg - head_delta_deg)
+
+    # Wing vertices at the base angle, sharing one cos/sin evaluation
+    rad = math.radians(angle_deg)
+    c, s = math.cos(rad), math.sin(rad)
+    outer_r = r + head_half_width
+    inner_r = r - head_half_width
+    outer_wing = (cx + outer_r * c, cy + outer_r * s)
+    inner_wing = (cx + inner_r * c, cy + inner_r * s)
+    draw.polygon([tip, outer_wing, inner_wing], fill=color)
+
+
 def draw_curved_arrow(draw, cx, cy, r, thickness, start_deg, end_deg,
-                      head_length, head_half_width, color, segments=POLYGON_SEGMENTS):
-    """Draw a curved arrow as one filled polygon.
+                      head_length, head_half_width, color):
+    """Draw a curved arrow: an arc body plus an arrowhead.
 
     The arc body runs CW (Pillow convention) from start_deg to end_deg.
     An arrowhead at start_deg points CCW (the visual direction of the arrow).
     """
-    half_t = thickness / 2
-    inner_r = r - half_t
-    outer_r = r + half_t
-
-    # CW angular span of the arc body
-    span = end_deg - start_deg
-    if span <= 0:
-        span += 360
-
-    # Arrowhead tip: on the centerline, past the arc start in the CCW direction
-    head_delta_deg = math.degrees(head_length / r)
-    tip_angle = start_deg - head_delta_deg
-    tip = point_on_circle(cx, cy, r, tip_angle)
+    # Pillow grows arc strokes inward from the bounding box, so the box sits
+    # on the outer edge of the stroke
+    outer_r = r + thickness / 2
+    arc_bbox = [cx - outer_r, cy - outer_r, cx + outer_r, cy + outer_r]
+    draw.arc(arc_bbox, start_deg, end_deg, fill=color, width=thickness)
+    draw_arrowhead(draw, cx, cy, r, start_deg, head_length, head_half_width, color)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_font(size):
+    """Load the first available font from _FONT_CANDIDATES, once per size."""
+    for path, index in _FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(path, size, index=index)
+        except OSError:
+            continue
+    paths = ", ".join(path for path, _ in _FONT_CANDIDATES)
+    raise RuntimeError(f"no usable font found (tried {paths})")
 
-    # Wing vertices at the arc start angle
-    outer_wing = point_on_circle(cx, cy, r + head_half_width, start_deg)
-    inner_wing = point_on_circle(cx, cy, r - head_half_width, start_deg)
 
-    # Build polygon vertices going around the perimeter
-    points = []
+def _font_key():
+    """Short digest naming the font _load_font would pick, without loading it.
 
-    # 1. Arrowhead tip
-    points.append(tip)
+    Uses the first candidate present on disk, so both editing _FONT_CANDIDATES
+    and installing or removing a font change the key.
+    """
+    chosen = next(
+        (candidate for candidate in _FONT_CANDIDATES if os.path.exists(candidate[0])),
+        _FONT_CANDIDATES,
+    )
+    return hashlib.sha256(repr(chosen).encode()).hexdigest()[:12]
 
-    # 2. Outer wing
-    points.append(outer_wing)
 
-    # 3. Outer arc edge (start → end, CW)
-    for i in range(segments + 1):
-        angle = start_deg + span * i / segments
-        points.append(point_on_circle(cx, cy, outer_r, angle))
+def letter_sprite(font_size, refresh=False):
+    """Coverage mask ("L" mode) of the centered "R", cached on disk.
 
-    # 4. Inner arc edge (end → start, CCW)
-    for i in range(segments, -1, -1):
-        angle = start_deg + span * i / segments
-        points.append(point_on_circle(cx, cy, inner_r, angle))
+    The glyph is drawn at the middle of a square canvas with anchor="mm", so
+    pasting it centered on the icon matches drawing the text there directly.
+    The mask carries no color, and the file name encodes the size and font
+    (see _font_key). refresh=True ignores and rewrites the cached file.
+    """
+    path = os.path.join(SPRITE_DIR, f"_R_sprite_{font_size}_{_font_key()}.png")
+    if not refresh and os.path.exists(path):
+        with Image.open(path) as cached:
+            return cached.convert("L")
 
-    # 5. Inner wing
-    points.append(inner_wing)
+    font = _load_font(font_size)
+    left, top, right, bottom = font.getbbox("R", anchor="mm")
+    half = math.ceil(max(-left, -top, right, bottom))
+    sprite = Image.new("L", (2 * half, 2 * half), 0)
+    ImageDraw.Draw(sprite).text((half, half), "R", fill=255, font=font, anchor="mm")
+    sprite.save(path, "PNG")
+    return sprite
 
-    # Polygon auto-closes back to tip
-    draw.polygon(points, fill=color)
 
+def render_icon(refresh=False):
+    """Render the icon and return it as a SIZE x SIZE RGBA image.
 
-def main():
-    img = Image.new("RGBA", (SIZE, SIZE), TRANSPARENT)
+    refresh=True re-rasterizes the "R" instead of using the cached sprite.
+    """
+    s = SUPERSAMPLE
+    center = CENTER * s
+    img = Image.new("RGBA", (RENDER_SIZE, RENDER_SIZE), TRANSPARENT)
     draw = ImageDraw.Draw(img)
 
     # --- Purple circular background ---
-    draw.ellipse([0, 0, SIZE - 1, SIZE - 1], fill=PURPLE)
+    draw.ellipse([0, 0, RENDER_SIZE - 1, RENDER_SIZE - 1], fill=PURPLE)
 
-    # Subtle inner ring for depth
-    inner_margin = 12
+    # Subtle inner ring for depth, drawn as an annulus so the disc inside it
+    # does not have to be filled twice
+    inner_margin = 12 * s
+    ring_width = 8 * s
     draw.ellipse(
-        [inner_margin, inner_margin, SIZE - 1 - inner_margin, SIZE - 1 - inner_margin],
-        fill=PURPLE_DARK,
-    )
-    inner_margin2 = 20
-    draw.ellipse(
-        [inner_margin2, inner_margin2, SIZE - 1 - inner_margin2, SIZE - 1 - inner_margin2],
-        fill=PURPLE,
+        [inner_margin, inner_margin,
+         RENDER_SIZE - 1 - inner_margin, RENDER_SIZE - 1 - inner_margin],
+        outline=PURPLE_DARK,
+        width=ring_width,
     )
 
     # --- Gold curved arrows (counterclockwise) ---
     draw_curved_arrow(
-        draw, CENTER, CENTER, ARROW_RADIUS, ARROW_THICKNESS,
-        ARC1_START, ARC1_END, ARROWHEAD_LENGTH, ARROWHEAD_HALF_WIDTH, GOLD,
+        draw, center, center, ARROW_RADIUS * s, ARROW_THICKNESS * s,
+        ARC1_START, ARC1_END, ARROWHEAD_LENGTH * s, ARROWHEAD_HALF_WIDTH * s, GOLD,
     )
     draw_curved_arrow(
-        draw, CENTER, CENTER, ARROW_RADIUS, ARROW_THICKNESS,
-        ARC2_START, ARC2_END, ARROWHEAD_LENGTH, ARROWHEAD_HALF_WIDTH, GOLD,
+        draw, center, center, ARROW_RADIUS * s, ARROW_THICKNESS * s,
+        ARC2_START, ARC2_END, ARROWHEAD_LENGTH * s, ARROWHEAD_HALF_WIDTH * s, GOLD,
     )
 
     # --- Central "R" letter ---
-    font_size = 380
+    sprite = letter_sprite(FONT_SIZE * s, refresh=refresh)
+    offset = center - sprite.width // 2
+    img.paste(GOLD, (offset, offset, offset + sprite.width, offset + sprite.height), sprite)
+
+    # Downsample to the final size; this is the anti-aliasing pass
+    return img.resize((SIZE, SIZE), Image.LANCZOS)
+
+
+def resize_variant(master, size):
+    """Downsample the master icon to size x size.
+
+    Exact integer factors use Image.reduce (a single box-filter pass);
+    anything else falls back to a LANCZOS resize.
+    """
+    factor, remainder = divmod(master.width, size)
+    if remainder == 0:
+        return master.reduce(factor)
+    return master.resize((size, size), Image.LANCZOS)
+
+
+def save_variants(master, sizes, log=sys.stdout):
+    """Write icon_<n>.png for each requested size, all from one master render."""
+    for size in sizes:
+        path = f"icon_{size}.png"
+        resize_variant(master, size).save(path, "PNG", compress_level=1)
+        print(f"Saved {path}", file=log)
+
+
+def _source_key():
+    """Digest of this script plus the Pillow version.
+
+    Installed fonts are not part of the key; --force covers font changes.
+    """
+    with open(__file__, "rb") as f:
+        source = f.read()
+    return hashlib.sha256(source + PIL.__version__.encode()).hexdigest()
+
+
+def _file_sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _is_up_to_date(output_path, stamp_path, key):
+    """True if the stamp matches both the source key and the PNG on disk.
+
+    The PNG digest catches a file replaced behind the stamp's back, e.g. the
+    tracked icon_1024.png restored by a checkout.
+    """
     try:
-        font = ImageFont.truetype(
-            "/System/Library/Fonts/Supplemental/Verdana Bold.ttf", font_size
-        )
-    except Exception:
-        try:
-            font = ImageFont.truetype(
-                "/System/Library/Fonts/HelveticaNeue.ttc", font_size, index=8
-            )
-        except Exception:
-            font = ImageFont.truetype("/Library/Fonts/Arial.ttf", font_size)
+        with open(stamp_path, encoding="utf-8") as f:
+            stamp = f.read().split()
+        return stamp == [key, _file_sha256(output_path)]
+    except OSError:
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the Rsync Studio app icon.")
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="write raw RGBA pixels to stdout instead of saving icon_1024.png",
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=int,
+        default=[],
+        metavar="N",
+        help=f"also write icon_<N>.png downsampled variants (N < {SIZE})",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="redraw icon_1024.png and the cached \"R\" even if they are up to date",
+    )
+    args = parser.parse_args(argv)
+    if any(not 0 < size < SIZE for size in args.sizes):
+        parser.error(f"--sizes must be between 1 and {SIZE - 1}")
 
-    draw.text((CENTER, CENTER), "R", fill=GOLD, font=font, anchor="mm")
+    output_path = "icon_1024.png"
+    stamp_path = f"{output_path}.sha256"
+    key = _source_key()
+    # --raw and --sizes always need the pixels, so only a plain run can skip
+    if not (args.raw or args.sizes or args.force) and _is_up_to_date(output_path, stamp_path, key):
+        print(f"{output_path} is up to date (use --force to redraw)")
+        return
+
+    img = render_icon(refresh=args.force)
+    # In --raw mode stdout carries pixels, so progress messages go to stderr
+    sizes = list(dict.fromkeys(args.sizes))  # one write per file, in order given
+    save_variants(img, sizes, log=sys.stderr if args.raw else sys.stdout)
+
+    if args.raw:
+        print(f"{SIZE} {SIZE} RGBA", file=sys.stderr)
+        sys.stdout.buffer.write(img.tobytes())
+        sys.stdout.buffer.flush()
+        return
 
     # Save at 1024×1024
-    output_path = "icon_1024.png"
-    img.save(output_path, "PNG")
+    # Keep RGBA: the corners outside the circle must stay transparent. The
+    # file is only an input to `tauri icon`, so favor speed over size.
+    img.save(output_path, "PNG", compress_level=1)
+    with open(stamp_path, "w", encoding="utf-8") as f:
+        f.write(f"{key}\n{_file_sha256(output_path)}\n")
     print(f"Saved {output_path}")
     print("Now run: npx tauri icon icon_1024.png -o .")
 